@@ -1,438 +1,1038 @@
-import sys
-import os
-import re
-import logging
-from PySide6.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QLineEdit, QPushButton, QListWidget, QFrame, QGroupBox, QMessageBox,
-    QCheckBox, QTreeWidget, QTreeWidgetItem, QHeaderView, QInputDialog
-)
-from PySide6.QtCore import Qt, QThread, Signal, Slot
-
-from pytubefix import YouTube
-from pytubefix.helpers import safe_filename, target_directory
-from pytubefix.itags import get_format_profile
-from pytubefix.monostate import Monostate
-from pytubefix.file_system import file_system_verify
-
-LOG_LEVEL = logging.INFO  # Change this to logging.DEBUG when you need detailed logs
-
-logging.basicConfig(
-    level=LOG_LEVEL,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("youtube_downloader.log"),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
-
-logger = logging.getLogger(__name__)
-
-class FetchThread(QThread):
-    finished = Signal(list, list, list, str)
-    error = Signal(str)
-    client_switched = Signal(str, str)
-
-    def __init__(self, url, use_oauth=False):
-        super().__init__()
-        self.url = url
-        self.use_oauth = use_oauth
-
-    def run(self):
-        try:
-            logger.debug(f"Initializing YouTube object with URL: {self.url} and use_oauth={self.use_oauth}")
-            yt = YouTube(self.url, use_oauth=self.use_oauth)
-            original_client = yt.client
-            logger.debug(f"Original client: {original_client}")
-
-            streams_info = []
-            streams_objects = []
-
-            for stream in yt.streams:
-                stream_info = (
-                    f"Itag: {stream.itag} | Type: {stream.type.capitalize()} | "
-                    f"Resolution: {getattr(stream, 'resolution', 'N/A')} | "
-                    f"FPS: {getattr(stream, 'fps', 'N/A')} | "
-                    f"Mime Type: {stream.mime_type} | "
-                    f"Filesize: {stream.filesize_mb:.2f} MB | "
-                    f"Adaptive: {'Yes' if stream.is_adaptive else 'No'} | "
-                    f"Progressive: {'Yes' if stream.is_progressive else 'No'} | "
-                    f"Audio: {'Yes' if stream.includes_audio_track else 'No'} | "
-                    f"Video: {'Yes' if stream.includes_video_track else 'No'}"
-                )
-                streams_info.append(stream_info)
-                streams_objects.append(stream)
-
-                logger.debug(f"Stream Info: {stream_info}")
-
-            captions_info = [f"{caption.name} ({caption.code})" for caption in yt.captions]
-            logger.debug(f"Available captions: {captions_info}")
-
-            if yt.client != original_client:
-                logger.debug(f"Client switched from {original_client} to {yt.client}")
-                self.client_switched.emit(original_client, yt.client)
-
-            self.finished.emit(streams_info, captions_info, streams_objects, "Data fetched successfully.")
-        except Exception as e:
-            logger.error(f"Error in FetchThread: {e}", exc_info=True)
-            self.error.emit(str(e))
-
-
-class DownloadThread(QThread):
-    completed = Signal(str)
-    error = Signal(str)
-
-    def __init__(self, stream, output_path=None, filename=None, filename_prefix=None,
-                 skip_existing=True, timeout=None, max_retries=0,
-                 interrupt_checker=None):
-        super().__init__()
-        self.stream = stream
-        self.output_path = output_path
-        self.filename = filename
-        self.filename_prefix = filename_prefix
-        self.skip_existing = skip_existing
-        self.timeout = timeout
-        self.max_retries = max_retries
-        self.interrupt_checker = interrupt_checker
-
-    def run(self):
-        try:
-            logger.debug(f"Starting download with filename: {self.filename}")
-            downloaded_file = self.stream.download(
-                output_path=self.output_path,
-                filename=self.filename,
-                filename_prefix=self.filename_prefix,
-                skip_existing=self.skip_existing,
-                timeout=self.timeout,
-                max_retries=self.max_retries,
-                interrupt_checker=self.interrupt_checker
-            )
-            if downloaded_file:
-                logger.info(f"Download completed: {downloaded_file}")
-                self.completed.emit(downloaded_file)
-            else:
-                logger.warning("Download was skipped or failed.")
-                self.error.emit("Download was skipped or failed.")
-        except Exception as e:
-            logger.error(f"Error in DownloadThread: {e}", exc_info=True)
-            self.error.emit(str(e))
-
-
-class MainWindow(QMainWindow):
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle("YouTube Video Info")
-        self.setGeometry(100, 100, 1200, 900)
-
-        self.streams_objects = []
-
-        central_widget = QWidget()
-        self.setCentralWidget(central_widget)
-        main_layout = QVBoxLayout(central_widget)
-
-        url_frame = QFrame()
-        url_layout = QHBoxLayout(url_frame)
-        url_label = QLabel("YouTube URL:")
-        self.url_entry = QLineEdit()
-        fetch_button = QPushButton("Fetch Info")
-        fetch_button.clicked.connect(self.fetch_video_info)
-        url_layout.addWidget(url_label)
-        url_layout.addWidget(self.url_entry)
-        url_layout.addWidget(fetch_button)
-        main_layout.addWidget(url_frame)
-
-        self.use_oauth = QCheckBox("Use OAuth (required for some age-restricted videos)")
-        main_layout.addWidget(self.use_oauth)
-
-        self.error_label = QLabel()
-        self.error_label.setStyleSheet("color: red;")
-        main_layout.addWidget(self.error_label)
-
-        self.title_label = QLabel()
-        self.title_label.setAlignment(Qt.AlignCenter)
-        self.title_label.setStyleSheet("font-weight: bold; font-size: 14px;")
-        main_layout.addWidget(self.title_label)
-
-        streams_group = QGroupBox("Available Streams")
-        streams_layout = QVBoxLayout(streams_group)
-
-        self.streams_tree = QTreeWidget()
-        self.streams_tree.setHeaderLabels([
-            "Stream Type",
-            "Resolution",
-            "FPS",
-            "Format",
-            "Filesize",
-            "Audio",
-            "Video",
-            "Adaptive",
-            "Progressive",
-            "Bitrate",
-            "Codecs"
-        ])
-
-        header = self.streams_tree.header()
-        header.setSectionResizeMode(QHeaderView.ResizeToContents)
-        self.streams_tree.setAlternatingRowColors(True)
-        self.streams_tree.setSortingEnabled(True)
-
-        streams_layout.addWidget(self.streams_tree)
-
-        self.download_button = QPushButton("Download Selected Stream")
-        self.download_button.setEnabled(False)
-        self.download_button.clicked.connect(self.download_selected_stream)
-        streams_layout.addWidget(self.download_button)
-
-        captions_group = QGroupBox("Available Captions")
-        captions_layout = QVBoxLayout(captions_group)
-        self.captions_listbox = QListWidget()
-        captions_layout.addWidget(self.captions_listbox)
-
-        info_layout = QVBoxLayout()
-        info_layout.addWidget(streams_group, stretch=4)
-        info_layout.addWidget(captions_group, stretch=1)
-        main_layout.addLayout(info_layout)
-
-        self.status_label = QLabel("Enter a YouTube URL and click Fetch Info to see available streams and captions.")
-        main_layout.addWidget(self.status_label)
-
-        self.streams_tree.itemSelectionChanged.connect(self.update_download_button_state)
-
-    def fetch_video_info(self):
-        url = self.url_entry.text().strip()
-        if not url:
-            self.error_label.setText("Please enter a YouTube video URL.")
-            return
-
-        self.status_label.setText("Fetching data...")
-        self.error_label.clear()
-        self.title_label.clear()
-        self.streams_tree.clear()
-        self.captions_listbox.clear()
-        self.download_button.setEnabled(False)
-
-        self.fetch_thread = FetchThread(url, use_oauth=self.use_oauth.isChecked())
-        self.fetch_thread.finished.connect(self.update_info)
-        self.fetch_thread.error.connect(self.show_error)
-        self.fetch_thread.client_switched.connect(self.show_client_switch)
-        self.fetch_thread.start()
-
-    @Slot(str, str)
-    def show_client_switch(self, original_client, new_client):
-        self.status_label.setText(
-            f"Client switched from {original_client} to {new_client} to fetch video data."
-        )
-        logger.debug(f"Client switched from {original_client} to {new_client}")
-
-    @Slot(list, list, list, str)
-    def update_info(self, streams_info, captions_info, streams_objects, status):
-        self.streams_objects = streams_objects
-        if streams_objects:
-            title = streams_objects[0].title
-            self.title_label.setText(title)
-            self.setWindowTitle(f"YouTube Video Info - {title}")
-            logger.debug(f"Video Title: {title}")
-
-        self.streams_tree.clear()
-
-        video_parent = QTreeWidgetItem(["Video Streams"])
-        audio_parent = QTreeWidgetItem(["Audio Streams"])
-        self.streams_tree.addTopLevelItem(video_parent)
-        self.streams_tree.addTopLevelItem(audio_parent)
-
-        for stream in streams_objects:
-            if stream.type == 'video':
-                parent = video_parent
-            else:
-                parent = audio_parent
-
-            item = QTreeWidgetItem(parent)
-            item.setText(0, f"Itag: {stream.itag}")
-            item.setText(1, str(getattr(stream, 'resolution', 'N/A')))
-            item.setText(2, str(getattr(stream, 'fps', 'N/A')))
-            item.setText(3, stream.mime_type)
-            item.setText(4, f"{stream.filesize_mb:.2f} MB")
-            item.setText(5, "Yes" if stream.includes_audio_track else "No")
-            item.setText(6, "Yes" if stream.includes_video_track else "No")
-            item.setText(7, "Yes" if stream.is_adaptive else "No")
-            item.setText(8, "Yes" if stream.is_progressive else "No")
-
-            bitrate = stream.abr if stream.includes_audio_track else "N/A"
-            item.setText(9, bitrate)
-
-            audio_codec, video_codec = stream.parse_codecs()
-            codecs = f"Audio: {audio_codec or 'N/A'}, Video: {video_codec or 'N/A'}"
-            item.setText(10, codecs)
-
-            tooltip = (
-                f"Itag: {stream.itag}\n"
-                f"Type: {stream.type}\n"
-                f"Resolution: {getattr(stream, 'resolution', 'N/A')}\n"
-                f"FPS: {getattr(stream, 'fps', 'N/A')}\n"
-                f"Mime Type: {stream.mime_type}\n"
-                f"Filesize: {stream.filesize_mb:.2f} MB\n"
-                f"Adaptive: {'Yes' if stream.is_adaptive else 'No'}\n"
-                f"Progressive: {'Yes' if stream.is_progressive else 'No'}\n"
-                f"Audio: {'Yes' if stream.includes_audio_track else 'No'}\n"
-                f"Video: {'Yes' if stream.includes_video_track else 'No'}\n"
-                f"Bitrate: {bitrate}\n"
-                f"Codecs: {codecs}"
-            )
-            item.setToolTip(0, tooltip)
-
-            logger.debug(f"Stream Selected: Type={stream.type}, Resolution={stream.resolution}, "
-                         f"FPS={getattr(stream, 'fps', 'N/A')}, Mime Type={stream.mime_type}, "
-                         f"Filesize={stream.filesize_mb:.2f} MB, Adaptive={stream.is_adaptive}, "
-                         f"Progressive={stream.is_progressive}, Audio={stream.includes_audio_track}, "
-                         f"Video={stream.includes_video_track}, Bitrate={bitrate}, Codecs={codecs}")
-
-        self.streams_tree.expandAll()
-
-        self.captions_listbox.addItems(captions_info)
-        self.status_label.setText(status)
-        self.error_label.clear()
-
-    def update_download_button_state(self):
-        selected_items = self.streams_tree.selectedItems()
-        self.download_button.setEnabled(bool(selected_items))
-
-    def get_selected_stream(self):
-        selected_items = self.streams_tree.selectedItems()
-        if not selected_items:
-            raise ValueError("Please select a stream to download.")
-
-        selected_item = selected_items[0]
-        itag_text = selected_item.text(0)
-        try:
-            itag = int(itag_text.split(": ")[1])
-        except (IndexError, ValueError):
-            raise ValueError("Invalid stream selection.")
-
-        selected_stream = next(
-            (stream for stream in self.streams_objects if stream.itag == itag),
-            None
-        )
-        if not selected_stream:
-            raise ValueError("Error: Could not find selected stream.")
-
-        logger.debug(f"Selected stream: Itag={itag}, Type={selected_stream.type}")
-        return selected_stream
-
-    def construct_filename(self, stream):
-        stream_type = "Audio" if stream.type == "audio" else "Video"
-        format_subtype = stream.subtype
-        bitrate = stream.abr if stream.includes_audio_track and stream.abr else "N/A"
-        resolution = stream.resolution if stream.includes_video_track and stream.resolution else "N/A"
-
-        base_title = re.sub(r'[\\/*?:"<>|]', "", stream.title)
-        filename_parts = [base_title, stream_type, format_subtype]
-
-        if bitrate != "N/A":
-            bitrate_str = bitrate if bitrate.lower().endswith("kbps") else f"{bitrate}kbps"
-            filename_parts.append(bitrate_str)
-
-        if resolution != "N/A":
-            filename_parts.append(resolution)
-
-        custom_filename = "_".join(filename_parts)
-
-        if stream.type == "audio" and not stream.includes_video_track:
-            file_extension = "m4a"
-            logger.debug("Stream is audio-only. Overriding file extension to '.m4a'")
-        else:
-            valid_subtypes = {"mp4", "webm", "m4a", "mp3", "ogg", "flv", "avi"}
-            file_extension = format_subtype if format_subtype in valid_subtypes else "mp4"
-            if format_subtype not in valid_subtypes:
-                logger.warning(f"Unexpected format subtype '{format_subtype}'. Falling back to 'mp4'.")
-
-        custom_filename_with_ext = f"{custom_filename}.{file_extension}"
-        max_length = 200
-        if len(custom_filename_with_ext) > max_length:
-            extension = f".{file_extension}"
-            custom_filename_with_ext = f"{custom_filename_with_ext[:max_length - len(extension)]}{extension}"
-            logger.warning(f"Filename truncated to: {custom_filename_with_ext}")
-
-        logger.debug(f"Constructed filename: {custom_filename_with_ext}")
-        return custom_filename_with_ext, file_extension
-
-    def get_confirmed_filename(self, proposed_filename, file_extension):
-        confirmed_filename, ok = QInputDialog.getText(
-            self,
-            "Confirm Filename",
-            f"Filename will be:\n{proposed_filename}\nDo you want to proceed?",
-            text=proposed_filename
-        )
-
-        if not ok:
-            raise ValueError("Download canceled by the user.")
-
-        if confirmed_filename and not confirmed_filename.lower().endswith(f".{file_extension}"):
-            confirmed_filename += f".{file_extension}"
-            logger.debug(f"Appended extension to user-modified filename: {confirmed_filename}")
-
-        return confirmed_filename or proposed_filename
-
-    def start_download(self, stream, filename):
-        self.status_label.setText(f"Starting download as: {filename}")
-        self.error_label.clear()
-        self.download_button.setEnabled(False)
-
-        self.download_thread = DownloadThread(
-            stream=stream,
-            filename=filename
-        )
-        self.download_thread.completed.connect(self.download_completed)
-        self.download_thread.error.connect(self.download_error)
-        self.download_thread.start()
-        logger.info(f"Download thread started for file: {filename}")
-
-    def handle_download_error(self, error_message):
-        self.error_label.setText(f"Error: {error_message}")
-        self.status_label.setText("Download failed.")
-        self.download_button.setEnabled(True)
-        QMessageBox.critical(self, "Download Error", error_message)
-        logger.error(f"Download error: {error_message}")
-
-    def download_selected_stream(self):
-        try:
-            selected_stream = self.get_selected_stream()
-
-            proposed_filename, file_extension = self.construct_filename(selected_stream)
-
-            final_filename = self.get_confirmed_filename(proposed_filename, file_extension)
-
-            self.start_download(selected_stream, final_filename)
-
-        except ValueError as ve:
-            self.error_label.setText(f"Error: {str(ve)}")
-            self.status_label.setText("Download failed.")
-            logger.error(f"Download setup error: {str(ve)}")
-        except Exception as e:
-            self.handle_download_error(str(e))
-
-    @Slot(str)
-    def download_completed(self, file_path):
-        self.status_label.setText(f"Download completed: {file_path}")
-        self.download_button.setEnabled(True)
-        QMessageBox.information(self, "Download Complete", f"File saved to:\n{file_path}")
-
-    @Slot(str)
-    def download_error(self, error_message):
-        self.error_label.setText(f"Error: {error_message}")
-        self.status_label.setText("Download failed.")
-        self.download_button.setEnabled(True)
-        QMessageBox.critical(self, "Download Error", error_message)
-        logger.error(f"Download error: {error_message}")
-
-    def show_error(self, error):
-        self.error_label.setText(f"Error: {error}")
-        self.status_label.setText("Failed to fetch data.")
-        logger.error(f"Fetch error: {error}")
-
-
-if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    app.setStyle('Fusion')
-    window = MainWindow()
-    window.show()
-    sys.exit(app.exec())
+import sys
+import os
+import io
+import re
+import json
+import time
+import queue
+import hashlib
+import shelve
+import socket
+import logging
+import pathlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import zip_longest
+from urllib.error import HTTPError, URLError
+
+import requests
+from requests.adapters import HTTPAdapter, Retry
+from PySide6.QtWidgets import (
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
+    QLineEdit, QPushButton, QListWidget, QFrame, QGroupBox, QMessageBox,
+    QCheckBox, QTreeView, QAbstractItemView, QHeaderView, QInputDialog,
+    QProgressBar
+)
+from PySide6.QtCore import (
+    Qt, QModelIndex, QObject, QRunnable, QSignalBlocker, QThreadPool, QTimer,
+    Signal, Slot
+)
+from PySide6.QtGui import QAction, QStandardItem, QStandardItemModel
+
+LOG_LEVEL = logging.INFO  # Change this to logging.DEBUG when you need detailed logs
+
+logging.basicConfig(
+    level=LOG_LEVEL,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler("youtube_downloader.log"),
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+
+logger = logging.getLogger(__name__)
+
+# Shared keep-alive session so pytubefix's many HTTPS requests per video
+# reuse pooled connections instead of paying a TLS handshake each time.
+http_session = requests.Session()
+http_session.mount("https://", HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.3)
+))
+
+
+class SessionResponse:
+    def __init__(self, response):
+        self._response = response
+        self.headers = response.headers
+
+    def read(self, amt=None):
+        return self._response.raw.read(amt, decode_content=True)
+
+    def info(self):
+        return self._response.headers
+
+
+BASE_HEADERS = {"User-Agent": "Mozilla/5.0", "accept-language": "en-US,en"}
+
+
+def session_execute_request(url, method=None, headers=None, data=None,
+                            timeout=socket._GLOBAL_DEFAULT_TIMEOUT):
+    request_headers = {**BASE_HEADERS, **headers} if headers else BASE_HEADERS
+    if data and not isinstance(data, bytes):
+        data = bytes(json.dumps(data), encoding="utf-8")
+    if not url.lower().startswith("http"):
+        raise ValueError("Invalid URL")
+    if timeout is socket._GLOBAL_DEFAULT_TIMEOUT:
+        timeout = None
+
+    try:
+        response = http_session.request(method or "GET", url, headers=request_headers,
+                                        data=data, timeout=timeout, stream=True)
+    except requests.RequestException as e:
+        raise URLError(e)
+
+    # Preserve urlopen's behavior of raising HTTPError on error statuses,
+    # which pytubefix relies on for its 404 fallbacks.
+    if response.status_code >= 400:
+        raise HTTPError(url, response.status_code, response.reason,
+                        response.headers, io.BytesIO(response.content))
+
+    return SessionResponse(response)
+
+
+RANGE_SIZE = 9437184  # 9 MB ranges, matching pytubefix's default
+DOWNLOAD_CHUNK_SIZE = 262144  # 256 KiB per write
+
+
+def session_stream(url, timeout=socket._GLOBAL_DEFAULT_TIMEOUT, max_retries=0,
+                   start=0):
+    from pytubefix.exceptions import MaxRetriesExceeded
+
+    if timeout is socket._GLOBAL_DEFAULT_TIMEOUT:
+        timeout = None
+
+    file_size = None  # unknown until the total size is probed
+    downloaded = start
+    while file_size is None or downloaded < file_size:
+        stop_pos = downloaded + RANGE_SIZE - 1
+        if file_size is not None:
+            stop_pos = min(stop_pos, file_size - 1)
+        tries = 0
+        while True:
+            if tries >= 1 + max_retries:
+                raise MaxRetriesExceeded()
+            try:
+                response = http_session.get(
+                    f"{url}&range={downloaded}-{stop_pos}",
+                    headers=BASE_HEADERS, stream=True, timeout=timeout
+                )
+                response.raise_for_status()
+                break
+            except requests.exceptions.HTTPError as e:
+                # Keep pytubefix's 404 fallback working.
+                raise HTTPError(url, e.response.status_code, e.response.reason,
+                                e.response.headers, None)
+            except requests.RequestException as e:
+                logger.debug("Retrying range %s-%s: %s", downloaded, stop_pos, e)
+            tries += 1
+
+        if file_size is None:
+            # A ranged response only reports its own length; probe the full
+            # size once and close the probe without reading the body.
+            try:
+                probe = http_session.get(f"{url}&range=0-99999999999",
+                                         headers=BASE_HEADERS, stream=True,
+                                         timeout=timeout)
+                file_size = int(probe.headers["Content-Length"])
+                probe.close()
+            except (KeyError, ValueError, requests.RequestException) as e:
+                logger.error(e)
+                file_size = stop_pos + 1  # stop after the current range
+
+        # 256 KiB chunks keep memory flat instead of buffering each 9 MB
+        # range in one piece before it hits the disk.
+        for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+            if chunk:
+                downloaded += len(chunk)
+                yield chunk
+    return
+
+
+YouTube = None  # imported lazily by load_youtube
+
+
+def load_youtube():
+    # Deferred so the window paints before pytubefix's regex-heavy import
+    # cost is paid; the session patch rides along with the first load.
+    global YouTube
+    if YouTube is None:
+        import pytubefix.request
+        pytubefix.request._execute_request = session_execute_request
+        pytubefix.request.stream = session_stream
+        install_cipher_cache()
+        from pytubefix import YouTube as _YouTube
+        YouTube = _YouTube
+    return YouTube
+
+
+VIDEO_ID_RE = re.compile(r"(?:v=|/)([0-9A-Za-z_-]{11})")
+
+FILENAME_TRANSLATION = str.maketrans('', '', '\\/*?:"<>|')
+
+VALID_SUBTYPES = frozenset({"mp4", "webm", "m4a", "mp3", "ogg", "flv", "avi"})
+
+
+def extract_video_id(url):
+    match = VIDEO_ID_RE.search(url)
+    return match.group(1) if match else None
+
+
+class MetadataCache:
+    def __init__(self, maxsize=1000):
+        self._entries = OrderedDict()
+        self._maxsize = maxsize
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key):
+        return self._entries.pop(key, None)
+
+
+metadata_cache = MetadataCache()
+
+# Shared so successive fetches reuse probe threads instead of spinning up
+# a fresh executor (and its OS threads) per click.
+probe_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="stream-probe")
+
+DISK_CACHE_TTL = 7 * 86400  # seven days
+
+disk_cache_lock = threading.Lock()
+
+
+def open_disk_cache():
+    cache_dir = pathlib.Path.home() / ".pytubefix-gui"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return shelve.open(str(cache_dir / "metadata"))
+
+
+def disk_cache_get(video_id):
+    with disk_cache_lock:
+        with open_disk_cache() as db:
+            entry = db.get(video_id)
+    if entry and time.time() - entry["fetched_at"] < DISK_CACHE_TTL:
+        return entry
+    return None
+
+
+def disk_cache_put(video_id, title, rows, captions_info):
+    with disk_cache_lock:
+        with open_disk_cache() as db:
+            db[video_id] = {
+                "title": title,
+                "rows": rows,
+                "captions": captions_info,
+                "fetched_at": time.time(),
+            }
+
+
+def disk_cache_evict(video_id):
+    with disk_cache_lock:
+        with open_disk_cache() as db:
+            if video_id in db:
+                del db[video_id]
+
+
+def open_cipher_cache():
+    cache_dir = pathlib.Path.home() / ".pytubefix-gui"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return shelve.open(str(cache_dir / "cipher"))
+
+
+def install_cipher_cache():
+    # Locating the sig/nsig function names is the CPU-heavy part of parsing
+    # base.js, and the answer only changes when YouTube ships a new player
+    # build, so remember it per player-JS hash across runs.
+    import pytubefix.cipher
+
+    def cached(method, label):
+        def wrapper(self, js, js_url):
+            key = f"{label}:{hashlib.sha1(js.encode()).hexdigest()}"
+            with disk_cache_lock:
+                with open_cipher_cache() as db:
+                    name = db.get(key)
+            if name is not None:
+                logger.debug("Cipher cache hit: %s", key)
+                return name
+            name = method(self, js, js_url)
+            with disk_cache_lock:
+                with open_cipher_cache() as db:
+                    db[key] = name
+            return name
+        return wrapper
+
+    cipher_class = pytubefix.cipher.Cipher
+    cipher_class.get_sig_function_name = cached(cipher_class.get_sig_function_name, "sig")
+    cipher_class.get_nsig_function_name = cached(cipher_class.get_nsig_function_name, "nsig")
+
+
+YES_NO = (sys.intern("No"), sys.intern("Yes"))
+NOT_AVAILABLE = sys.intern("N/A")
+FILESIZE_PENDING = sys.intern("…")
+
+
+def build_stream_fields(stream):
+    # Derive the boolean columns from one is_adaptive check instead of
+    # going through the four interdependent Stream properties per row.
+    adaptive = bool(stream.is_adaptive)
+    progressive = not adaptive
+    stream_type = stream.type
+    has_audio = progressive or stream_type == "audio"
+    has_video = progressive or stream_type == "video"
+    video_codec, audio_codec = stream.parse_codecs()
+    return {
+        "Itag": stream.itag,
+        "Type": stream_type,
+        "Resolution": str(getattr(stream, 'resolution', None) or NOT_AVAILABLE),
+        "FPS": str(getattr(stream, 'fps', None) or NOT_AVAILABLE),
+        # Interned so rows sharing a mime type share one string object.
+        "Mime Type": sys.intern(stream.mime_type),
+        # Learning the size costs an HTTP HEAD per stream; leave a
+        # placeholder and resolve it when the user shows interest.
+        "Filesize": FILESIZE_PENDING,
+        "Adaptive": YES_NO[adaptive],
+        "Progressive": YES_NO[progressive],
+        "Audio": YES_NO[has_audio],
+        "Video": YES_NO[has_video],
+        "Bitrate": (stream.abr or NOT_AVAILABLE) if has_audio else NOT_AVAILABLE,
+        "Codecs": f"Audio: {audio_codec or NOT_AVAILABLE}, Video: {video_codec or NOT_AVAILABLE}",
+    }
+
+
+def build_tooltip(fields):
+    return "\n".join(f"{key}: {value}" for key, value in fields.items())
+
+
+class FetchRunnable(QRunnable):
+    class Signals(QObject):
+        finished = Signal(str, list, list, list, str)
+        error = Signal(str)
+        client_switched = Signal(str, str)
+
+    def __init__(self, url, use_oauth=False):
+        super().__init__()
+        self.signals = FetchRunnable.Signals()
+        self.url = url
+        self.use_oauth = use_oauth
+
+    def run(self):
+        try:
+            video_id = extract_video_id(self.url)
+            cache_key = (video_id, self.use_oauth)
+            if video_id:
+                entry = disk_cache_get(video_id)
+                if entry is not None:
+                    logger.debug("Disk cache hit for video ID: %s", video_id)
+                    # Stream objects are not persisted; downloads resurrect
+                    # them from the URL and itag on demand.
+                    self.signals.finished.emit(entry["title"], entry["rows"],
+                                               entry["captions"], [],
+                                               "Data loaded from disk cache.")
+                    return
+
+            logger.debug("Initializing YouTube object with URL: %s and use_oauth=%s", self.url, self.use_oauth)
+            yt = load_youtube()(self.url, use_oauth=self.use_oauth)
+            original_client = yt.client
+            logger.debug("Original client: %s", original_client)
+
+            title = yt.title
+            streams_objects = list(yt.streams)
+            logger.debug("Fetched %d streams", len(streams_objects))
+
+            # Pure attribute parsing now that filesizes resolve lazily; no
+            # network round-trips left to parallelize here.
+            rows = [build_stream_fields(stream) for stream in streams_objects]
+
+            captions_info = [f"{caption.name} ({caption.code})" for caption in yt.captions]
+            logger.debug("Available captions: %s", captions_info)
+
+            if yt.client != original_client:
+                logger.debug("Client switched from %s to %s", original_client, yt.client)
+                self.signals.client_switched.emit(original_client, yt.client)
+
+            if video_id:
+                metadata_cache.put(cache_key, (title, rows, captions_info, streams_objects))
+                disk_cache_put(video_id, title, rows, captions_info)
+
+            self.signals.finished.emit(title, rows, captions_info, streams_objects,
+                                       "Data fetched successfully.")
+        except Exception as e:
+            logger.error("Error in FetchRunnable: %s", e, exc_info=True)
+            self.signals.error.emit(str(e))
+
+
+class DownloadRunnable(QRunnable):
+    class Signals(QObject):
+        completed = Signal(str)
+        error = Signal(str)
+        progress = Signal(int, int)
+
+    def __init__(self, stream, itag=None, url=None, use_oauth=False,
+                 output_path=None, filename=None, filename_prefix=None,
+                 skip_existing=True, timeout=None, max_retries=0,
+                 interrupt_checker=None):
+        super().__init__()
+        self.signals = DownloadRunnable.Signals()
+        self.stream = stream
+        self.itag = itag
+        self.url = url
+        self.use_oauth = use_oauth
+        self.output_path = output_path
+        self.filename = filename
+        self.filename_prefix = filename_prefix
+        self.skip_existing = skip_existing
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.interrupt_checker = interrupt_checker
+        self._filesize = 0
+        self._last_emit = 0.0
+
+    def report_progress(self, chunk, file_handler, bytes_remaining):
+        # Throttle to one emission per 100 ms; per-chunk signal dispatch
+        # into the event loop would itself become a bottleneck.
+        now = time.monotonic()
+        if now - self._last_emit < 0.1:
+            return
+        self._last_emit = now
+        # MiB units keep the values inside Qt's 32-bit signal arguments.
+        self.signals.progress.emit((self._filesize - bytes_remaining) >> 20,
+                                   self._filesize >> 20)
+
+    def run(self):
+        try:
+            stream = self.stream
+            if stream is None:
+                # Row came from the disk cache; rebuild the stream from the
+                # URL and itag before downloading.
+                logger.debug("Resurrecting stream itag=%s for URL: %s", self.itag, self.url)
+                yt = load_youtube()(self.url, use_oauth=self.use_oauth)
+                stream = yt.streams.get_by_itag(int(self.itag))
+                if stream is None:
+                    self.signals.error.emit("Could not find the selected stream anymore.")
+                    return
+
+            self._filesize = stream.filesize
+
+            logger.debug("Starting download with filename: %s", self.filename)
+            if stream.is_sabr:
+                # SABR streams negotiate their own transport; leave those to
+                # pytubefix rather than re-implement ServerAbrStream.
+                stream._monostate.on_progress = self.report_progress
+                downloaded_file = stream.download(
+                    output_path=self.output_path,
+                    filename=self.filename,
+                    filename_prefix=self.filename_prefix,
+                    skip_existing=self.skip_existing,
+                    timeout=self.timeout,
+                    max_retries=self.max_retries,
+                    interrupt_checker=self.interrupt_checker
+                )
+            else:
+                downloaded_file = self.download_resumable(stream)
+            if downloaded_file:
+                logger.info("Download completed: %s", downloaded_file)
+                self.signals.completed.emit(downloaded_file)
+            else:
+                logger.warning("Download was skipped or failed.")
+                self.signals.error.emit("Download was skipped or failed.")
+        except Exception as e:
+            logger.error("Error in DownloadRunnable: %s", e, exc_info=True)
+            self.signals.error.emit(str(e))
+
+    WRITE_QUEUE_CHUNKS = 64  # 16 MB of 256 KiB chunks between net and disk
+
+    def download_resumable(self, stream):
+        from pytubefix.exceptions import MaxRetriesExceeded
+
+        file_path = stream.get_file_path(
+            filename=self.filename,
+            output_path=self.output_path,
+            filename_prefix=self.filename_prefix,
+        )
+        if self.skip_existing and stream.exists_at_path(file_path):
+            logger.debug("File %s already exists, skipping", file_path)
+            return file_path
+
+        write_queue = queue.Queue(maxsize=self.WRITE_QUEUE_CHUNKS)
+        writer_error = []
+
+        def drain(fh):
+            # Disk writes happen here so a slow drive never stalls the
+            # socket; the bounded queue caps the memory held between them.
+            while True:
+                chunk = write_queue.get()
+                if chunk is None:
+                    return
+                try:
+                    fh.write(chunk)
+                except OSError as e:
+                    writer_error.append(e)
+                    return
+
+        def enqueue(chunk):
+            while not writer_error:
+                try:
+                    write_queue.put(chunk, timeout=1)
+                    return
+                except queue.Full:
+                    continue
+            raise writer_error[0]
+
+        offset = 0
+        attempts = 0
+        with open(file_path, "wb") as fh:
+            writer = threading.Thread(target=drain, args=(fh,),
+                                      name="download-writer", daemon=True)
+            writer.start()
+            try:
+                while True:
+                    try:
+                        for chunk in session_stream(stream.url,
+                                                    timeout=self.timeout,
+                                                    max_retries=self.max_retries,
+                                                    start=offset):
+                            if self.interrupt_checker is not None and self.interrupt_checker():
+                                logger.debug("interrupt_checker stopped the download")
+                                return None
+                            offset += len(chunk)
+                            enqueue(chunk)
+                            self.report_progress(chunk, fh, self._filesize - offset)
+                        break
+                    except HTTPError as e:
+                        # Matches pytubefix's tolerance for trailing 404s.
+                        if e.code != 404:
+                            raise
+                        break
+                    except (OSError, MaxRetriesExceeded) as e:
+                        if writer_error or attempts >= self.max_retries:
+                            raise
+                        attempts += 1
+                        # Bytes already on disk stay; the next request asks
+                        # for the remainder instead of starting over.
+                        logger.warning("Resuming download at byte %d after: %s", offset, e)
+            finally:
+                if writer_error:
+                    while not write_queue.empty():
+                        write_queue.get_nowait()
+                write_queue.put(None)
+                writer.join()
+        if writer_error:
+            raise writer_error[0]
+        stream.on_complete(file_path)
+        return file_path
+
+
+class LazyStreamModel(QStandardItemModel):
+    # New rows wait in a pending list and materialize in batches as the
+    # view asks for them, so huge stream lists render their first screen
+    # immediately. Typical videos fit in one batch and load as before.
+    BATCH = 32
+
+    def __init__(self, rows, columns):
+        super().__init__(rows, columns)
+        # Keyed by id() because QStandardItem is not hashable in PySide6.
+        self.pending = {}  # id(parent item) -> list of row-item lists
+
+    def queue_row(self, parent, row_items):
+        self.pending.setdefault(id(parent), []).append(row_items)
+
+    def discard_pending(self, row_items):
+        for rows in self.pending.values():
+            if row_items in rows:
+                rows.remove(row_items)
+                return
+
+    def canFetchMore(self, parent):
+        if self.pending.get(id(self.itemFromIndex(parent))):
+            return True
+        return super().canFetchMore(parent)
+
+    def fetchMore(self, parent):
+        item = self.itemFromIndex(parent)
+        rows = self.pending.get(id(item))
+        if rows:
+            for row_items in rows[:self.BATCH]:
+                item.appendRow(row_items)
+            del rows[:self.BATCH]
+        else:
+            super().fetchMore(parent)
+
+
+class MainWindow(QMainWindow):
+    # Emitted from probe threads; the queued connection delivers the
+    # resolved filesize text back on the GUI thread.
+    filesize_resolved = Signal(object, str)
+
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("YouTube Video Info")
+        self.setGeometry(100, 100, 1200, 900)
+
+        self.current_title = ""
+        self.current_url = ""
+
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(min(8, 2 * (os.cpu_count() or 4)))
+        self.pool.setExpiryTimeout(-1)  # keep workers alive between tasks
+
+        video_menu = self.menuBar().addMenu("&Video")
+        refresh_action = QAction("Refresh Metadata", self)
+        refresh_action.triggered.connect(self.refresh_metadata)
+        video_menu.addAction(refresh_action)
+
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        main_layout = QVBoxLayout(central_widget)
+
+        url_frame = QFrame()
+        url_layout = QHBoxLayout(url_frame)
+        url_label = QLabel("YouTube URL:")
+        self.url_entry = QLineEdit()
+        fetch_button = QPushButton("Fetch Info")
+        fetch_button.clicked.connect(self.fetch_video_info)
+        url_layout.addWidget(url_label)
+        url_layout.addWidget(self.url_entry)
+        url_layout.addWidget(fetch_button)
+        main_layout.addWidget(url_frame)
+
+        self.use_oauth = QCheckBox("Use OAuth (required for some age-restricted videos)")
+        main_layout.addWidget(self.use_oauth)
+
+        self.error_label = QLabel()
+        self.error_label.setStyleSheet("color: red;")
+        main_layout.addWidget(self.error_label)
+
+        self.title_label = QLabel()
+        self.title_label.setAlignment(Qt.AlignCenter)
+        self.title_label.setStyleSheet("font-weight: bold; font-size: 14px;")
+        main_layout.addWidget(self.title_label)
+
+        streams_group = QGroupBox("Available Streams")
+        streams_layout = QVBoxLayout(streams_group)
+
+        self.streams_model = LazyStreamModel(0, 11)
+        self.streams_model.setHorizontalHeaderLabels([
+            "Stream Type",
+            "Resolution",
+            "FPS",
+            "Format",
+            "Filesize",
+            "Audio",
+            "Video",
+            "Adaptive",
+            "Progressive",
+            "Bitrate",
+            "Codecs"
+        ])
+
+        self.streams_view = QTreeView()
+        self.streams_view.setModel(self.streams_model)
+
+        header = self.streams_view.header()
+        header.setSectionResizeMode(QHeaderView.Interactive)
+        self.streams_view.setAlternatingRowColors(True)
+        # Every row is one line of text; telling the view so lets it skip
+        # per-row height queries during layout and scrolling.
+        self.streams_view.setUniformRowHeights(True)
+        self.streams_view.setSortingEnabled(True)
+        self.streams_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.streams_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.streams_view.setMouseTracking(True)
+        self.streams_view.entered.connect(self.build_item_tooltip)
+        self.streams_view.verticalScrollBar().valueChanged.connect(self.fetch_more_rows)
+
+        self.video_parent = QStandardItem("Video Streams")
+        self.audio_parent = QStandardItem("Audio Streams")
+        self.streams_model.appendRow(self.video_parent)
+        self.streams_model.appendRow(self.audio_parent)
+        self.items_by_itag = {}
+        self.filesize_requests = set()
+        self.filesize_resolved.connect(self.apply_filesize)
+
+        streams_layout.addWidget(self.streams_view)
+
+        self.download_button = QPushButton("Download Selected Stream")
+        self.download_button.setEnabled(False)
+        self.download_button.clicked.connect(self.download_selected_stream)
+        streams_layout.addWidget(self.download_button)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        streams_layout.addWidget(self.progress_bar)
+
+        captions_group = QGroupBox("Available Captions")
+        captions_layout = QVBoxLayout(captions_group)
+        self.captions_listbox = QListWidget()
+        captions_layout.addWidget(self.captions_listbox)
+
+        info_layout = QVBoxLayout()
+        info_layout.addWidget(streams_group, stretch=4)
+        info_layout.addWidget(captions_group, stretch=1)
+        main_layout.addLayout(info_layout)
+
+        self.status_label = QLabel("Enter a YouTube URL and click Fetch Info to see available streams and captions.")
+        main_layout.addWidget(self.status_label)
+
+        self.streams_view.selectionModel().selectionChanged.connect(
+            self.update_download_button_state)
+
+    def fetch_video_info(self):
+        url = self.url_entry.text().strip()
+        if not url:
+            self.error_label.setText("Please enter a YouTube video URL.")
+            return
+
+        self.current_url = url
+        self.status_label.setText("Fetching data...")
+        self.error_label.clear()
+        self.title_label.clear()
+        self.captions_listbox.clear()
+        self.download_button.setEnabled(False)
+
+        # In-memory hits skip the worker thread entirely; the deferred call
+        # keeps the slot running on a clean event-loop turn.
+        video_id = extract_video_id(url)
+        cached = metadata_cache.get((video_id, self.use_oauth.isChecked())) if video_id else None
+        if cached is not None:
+            logger.debug("Metadata cache hit for video ID: %s", video_id)
+            title, rows, captions_info, streams_objects = cached
+            QTimer.singleShot(0, lambda: self.update_info(
+                title, rows, captions_info, streams_objects, "Data loaded from cache."))
+            return
+
+        self.fetch_runnable = FetchRunnable(url, use_oauth=self.use_oauth.isChecked())
+        self.fetch_runnable.signals.finished.connect(self.update_info)
+        self.fetch_runnable.signals.error.connect(self.show_error)
+        self.fetch_runnable.signals.client_switched.connect(self.show_client_switch)
+        self.pool.start(self.fetch_runnable)
+
+    def refresh_metadata(self):
+        url = self.url_entry.text().strip()
+        video_id = extract_video_id(url)
+        if video_id:
+            metadata_cache.pop((video_id, True))
+            metadata_cache.pop((video_id, False))
+            disk_cache_evict(video_id)
+            logger.debug("Evicted cached metadata for video ID: %s", video_id)
+        self.fetch_video_info()
+
+    @Slot(str, str)
+    def show_client_switch(self, original_client, new_client):
+        self.status_label.setText(
+            f"Client switched from {original_client} to {new_client} to fetch video data."
+        )
+        logger.debug("Client switched from %s to %s", original_client, new_client)
+
+    @Slot(str, list, list, list, str)
+    def update_info(self, title, rows, captions_info, streams_objects, status):
+        self.current_title = title
+        if title:
+            self.title_label.setText(title)
+            self.setWindowTitle(f"YouTube Video Info - {title}")
+            logger.debug("Video Title: %s", title)
+
+        self.streams_view.setUpdatesEnabled(False)
+        self.streams_view.setSortingEnabled(False)
+        # Silence per-item dataChanged/rowsInserted emissions while the rows
+        # are rebuilt; one layoutChanged below tells the view to re-read.
+        blocker = QSignalBlocker(self.streams_model)
+        column_count = self.streams_model.columnCount()
+        try:
+            new_rows = {}
+            for fields, stream in zip_longest(rows, streams_objects):
+                new_rows[(fields["Type"], fields["Itag"])] = (fields, stream)
+
+            # Drop rows whose stream disappeared, reuse the rest in place.
+            for key in list(self.items_by_itag):
+                if key not in new_rows:
+                    row_items = self.items_by_itag.pop(key)
+                    parent = row_items[0].parent()
+                    if parent is not None:
+                        parent.removeRow(row_items[0].row())
+                    else:
+                        self.streams_model.discard_pending(row_items)
+
+            for key, (fields, stream) in new_rows.items():
+                row_items = self.items_by_itag.get(key)
+                if row_items is None:
+                    row_items = [QStandardItem() for _ in range(column_count)]
+                    self.items_by_itag[key] = row_items
+                    if fields["Type"] == 'video':
+                        self.streams_model.queue_row(self.video_parent, row_items)
+                    else:
+                        self.streams_model.queue_row(self.audio_parent, row_items)
+                self.populate_stream_row(row_items, fields, stream)
+        finally:
+            blocker.unblock()
+            self.streams_model.layoutChanged.emit()
+            # One text-metrics pass per column instead of per setText.
+            for column in range(column_count):
+                self.streams_view.resizeColumnToContents(column)
+            self.streams_view.setSortingEnabled(True)
+            self.streams_view.setUpdatesEnabled(True)
+
+        for parent in (self.video_parent, self.audio_parent):
+            index = self.streams_model.indexFromItem(parent)
+            # expand() only triggers fetchMore on a collapsed parent, so
+            # seed the first batch explicitly when a refetch queued rows.
+            if parent.rowCount() < LazyStreamModel.BATCH and self.streams_model.canFetchMore(index):
+                self.streams_model.fetchMore(index)
+            self.streams_view.expand(index)
+
+        self.captions_listbox.addItems(captions_info)
+        self.status_label.setText(status)
+        self.error_label.clear()
+
+    COLUMN_KEYS = ("Resolution", "FPS", "Mime Type", "Filesize", "Audio",
+                   "Video", "Adaptive", "Progressive", "Bitrate", "Codecs")
+
+    def populate_stream_row(self, row_items, fields, stream):
+        first = row_items[0]
+        first.setData(stream, Qt.UserRole)
+        if first.data(Qt.UserRole + 1) != fields:
+            first.setData(fields, Qt.UserRole + 1)
+            first.setData(None, Qt.ToolTipRole)
+
+        itag_text = f"Itag: {fields['Itag']}"
+        if first.text() != itag_text:
+            first.setText(itag_text)
+        for column, key in enumerate(self.COLUMN_KEYS, start=1):
+            value = fields[key]
+            if row_items[column].text() != value:
+                row_items[column].setText(value)
+
+    @Slot(int)
+    def fetch_more_rows(self, value):
+        # QTreeView only auto-fetches the root index while scrolling; pull
+        # the next batch for a parent once the user nears the bottom.
+        if value < self.streams_view.verticalScrollBar().maximum() - 2:
+            return
+        for parent in (self.video_parent, self.audio_parent):
+            index = self.streams_model.indexFromItem(parent)
+            if self.streams_model.canFetchMore(index):
+                self.streams_model.fetchMore(index)
+                return
+
+    @Slot(QModelIndex)
+    def build_item_tooltip(self, index):
+        first = self.streams_model.itemFromIndex(index.siblingAtColumn(0))
+        if first is None:
+            return
+        self.request_filesize(first)
+        if first.data(Qt.ToolTipRole):
+            return
+        fields = first.data(Qt.UserRole + 1)
+        if fields:
+            first.setToolTip(build_tooltip(fields))
+
+    FILESIZE_COLUMN = 4  # "Filesize" position in the model columns
+
+    def request_filesize(self, first):
+        fields = first.data(Qt.UserRole + 1)
+        if fields is None or fields["Filesize"] != FILESIZE_PENDING:
+            return
+        stream = first.data(Qt.UserRole)
+        if stream is None:
+            # Disk-cache row with no live stream; the size shows up once a
+            # download resurrects it.
+            return
+        key = (fields["Type"], fields["Itag"])
+        if key in self.filesize_requests:
+            return
+        self.filesize_requests.add(key)
+
+        def probe():
+            try:
+                text = "%.2f MB" % stream.filesize_mb
+            except Exception as e:
+                logger.debug("Filesize probe failed for itag %s: %s", fields["Itag"], e)
+                text = NOT_AVAILABLE
+            self.filesize_resolved.emit(key, text)
+
+        probe_executor.submit(probe)
+
+    @Slot(object, str)
+    def apply_filesize(self, key, text):
+        self.filesize_requests.discard(key)
+        row_items = self.items_by_itag.get(key)
+        if row_items is None:
+            return
+        first = row_items[0]
+        fields = first.data(Qt.UserRole + 1)
+        if fields is not None and fields["Filesize"] == FILESIZE_PENDING:
+            # data() hands back a converted copy of the dict, so the
+            # updated fields have to be stored again explicitly.
+            fields["Filesize"] = text
+            first.setData(fields, Qt.UserRole + 1)
+            first.setData(None, Qt.ToolTipRole)  # rebuilt on next hover
+        row_items[self.FILESIZE_COLUMN].setText(text)
+
+    def update_download_button_state(self):
+        selected_rows = self.streams_view.selectionModel().selectedRows()
+        self.download_button.setEnabled(bool(selected_rows))
+        if selected_rows:
+            first = self.streams_model.itemFromIndex(selected_rows[0])
+            if first is not None:
+                self.request_filesize(first)
+
+    def get_selected_stream(self):
+        selected_rows = self.streams_view.selectionModel().selectedRows()
+        if not selected_rows:
+            raise ValueError("Please select a stream to download.")
+
+        fields = selected_rows[0].data(Qt.UserRole + 1)
+        if fields is None:
+            raise ValueError("Please select a stream to download.")
+
+        selected_stream = selected_rows[0].data(Qt.UserRole)
+        logger.debug("Selected stream: Itag=%s, Type=%s", fields['Itag'], fields['Type'])
+        return selected_stream, fields
+
+    def construct_filename(self, fields, title):
+        stream_type = "Audio" if fields["Type"] == "audio" else "Video"
+        format_subtype = fields["Mime Type"].partition("/")[2]
+        bitrate = fields["Bitrate"]
+        resolution = fields["Resolution"] if fields["Video"] == "Yes" else NOT_AVAILABLE
+
+        base_title = title.translate(FILENAME_TRANSLATION)
+        filename_parts = [base_title, stream_type, format_subtype]
+
+        if bitrate != NOT_AVAILABLE:
+            bitrate_str = bitrate if bitrate.lower().endswith("kbps") else f"{bitrate}kbps"
+            filename_parts.append(bitrate_str)
+
+        if resolution != NOT_AVAILABLE:
+            filename_parts.append(resolution)
+
+        custom_filename = "_".join(filename_parts)
+
+        if fields["Type"] == "audio" and fields["Video"] == "No":
+            file_extension = "m4a"
+            logger.debug("Stream is audio-only. Overriding file extension to '.m4a'")
+        elif format_subtype in VALID_SUBTYPES:
+            file_extension = format_subtype
+        else:
+            file_extension = "mp4"
+            logger.warning("Unexpected format subtype '%s'. Falling back to 'mp4'.", format_subtype)
+
+        custom_filename_with_ext = f"{custom_filename}.{file_extension}"
+        max_length = 200
+        if len(custom_filename_with_ext) > max_length:
+            extension = f".{file_extension}"
+            custom_filename_with_ext = f"{custom_filename_with_ext[:max_length - len(extension)]}{extension}"
+            logger.warning("Filename truncated to: %s", custom_filename_with_ext)
+
+        logger.debug("Constructed filename: %s", custom_filename_with_ext)
+        return custom_filename_with_ext, file_extension
+
+    def get_confirmed_filename(self, proposed_filename, file_extension):
+        confirmed_filename, ok = QInputDialog.getText(
+            self,
+            "Confirm Filename",
+            f"Filename will be:\n{proposed_filename}\nDo you want to proceed?",
+            text=proposed_filename
+        )
+
+        if not ok:
+            raise ValueError("Download canceled by the user.")
+
+        if confirmed_filename and not confirmed_filename.lower().endswith(f".{file_extension}"):
+            confirmed_filename += f".{file_extension}"
+            logger.debug("Appended extension to user-modified filename: %s", confirmed_filename)
+
+        return confirmed_filename or proposed_filename
+
+    def start_download(self, stream, fields, filename):
+        self.status_label.setText(f"Starting download as: {filename}")
+        self.error_label.clear()
+        self.download_button.setEnabled(False)
+
+        self.download_runnable = DownloadRunnable(
+            stream=stream,
+            itag=fields["Itag"],
+            url=self.current_url,
+            use_oauth=self.use_oauth.isChecked(),
+            filename=filename,
+            max_retries=3
+        )
+        self.download_runnable.signals.completed.connect(self.download_completed)
+        self.download_runnable.signals.error.connect(self.download_error)
+        self.download_runnable.signals.progress.connect(self.update_download_progress)
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.setVisible(True)
+        self.pool.start(self.download_runnable)
+        logger.info("Download task started for file: %s", filename)
+
+    def handle_download_error(self, error_message):
+        self.error_label.setText(f"Error: {error_message}")
+        self.status_label.setText("Download failed.")
+        self.download_button.setEnabled(True)
+        QMessageBox.critical(self, "Download Error", error_message)
+        logger.error("Download error: %s", error_message)
+
+    def download_selected_stream(self):
+        try:
+            selected_stream, fields = self.get_selected_stream()
+
+            proposed_filename, file_extension = self.construct_filename(fields, self.current_title)
+
+            final_filename = self.get_confirmed_filename(proposed_filename, file_extension)
+
+            self.start_download(selected_stream, fields, final_filename)
+
+        except ValueError as ve:
+            self.error_label.setText(f"Error: {str(ve)}")
+            self.status_label.setText("Download failed.")
+            logger.error("Download setup error: %s", ve)
+        except Exception as e:
+            self.handle_download_error(str(e))
+
+    @Slot(int, int)
+    def update_download_progress(self, downloaded_mb, total_mb):
+        maximum = max(total_mb, 1)
+        if self.progress_bar.maximum() != maximum:
+            self.progress_bar.setRange(0, maximum)
+        self.progress_bar.setValue(min(downloaded_mb, maximum))
+
+    @Slot(str)
+    def download_completed(self, file_path):
+        self.status_label.setText(f"Download completed: {file_path}")
+        self.progress_bar.setRange(0, 1)
+        self.progress_bar.setValue(1)
+        self.download_button.setEnabled(True)
+        QMessageBox.information(self, "Download Complete", f"File saved to:\n{file_path}")
+
+    @Slot(str)
+    def download_error(self, error_message):
+        self.error_label.setText(f"Error: {error_message}")
+        self.status_label.setText("Download failed.")
+        self.progress_bar.setVisible(False)
+        self.download_button.setEnabled(True)
+        QMessageBox.critical(self, "Download Error", error_message)
+        logger.error("Download error: %s", error_message)
+
+    def show_error(self, error):
+        self.error_label.setText(f"Error: {error}")
+        self.status_label.setText("Failed to fetch data.")
+        logger.error("Fetch error: %s", error)
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    app.setStyle('Fusion')
+    app.aboutToQuit.connect(http_session.close)
+    window = MainWindow()
+    window.show()
+    sys.exit(app.exec())